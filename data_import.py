@@ -6,9 +6,14 @@ Created by: Zayeem Khateeb
 This script helps you import your real data into the system.
 """
 
-import pandas as pd
+# pandas, polars, pyarrow and SQLAlchemy are imported inside the methods that use
+# them, so validation and the usage screen start without loading them
+import csv
+import io
+import itertools
 import sys
 import os
+from contextlib import contextmanager
 from datetime import datetime
 
 # Add src directory to path
@@ -16,33 +21,93 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from config.database import DatabaseConfig
 
+def _psql_copy(table, conn, keys, data_iter):
+    """pandas.to_sql insertion method that bulk-loads rows via PostgreSQL COPY (psycopg2 only)"""
+    dbapi_conn = conn.connection
+    with dbapi_conn.cursor() as cur:
+        buf = io.StringIO()
+        csv.writer(buf).writerows(data_iter)
+        buf.seek(0)
+        
+        columns = ', '.join(f'"{k}"' for k in keys)
+        table_name = f'{table.schema}.{table.name}' if table.schema else table.name
+        cur.copy_expert(f'COPY {table_name} ({columns}) FROM STDIN WITH CSV', buf)
+
 class DataImporter:
     def __init__(self):
         self.db = DatabaseConfig()
+        self._engine = None
+    
+    @property
+    def engine(self):
+        """SQLAlchemy engine, created on first use"""
+        if self._engine is None:
+            from sqlalchemy import create_engine
+            
+            self._engine = create_engine(self.db.url)
+        return self._engine
+        
+    def import_from_csv(self, csv_file_path, table_name, datetime_format=None, chunk_size=100_000):
+        """Import data from CSV file to database table, streaming it in chunks"""
+        import polars as pl
         
-    def import_from_csv(self, csv_file_path, table_name):
-        """Import data from CSV file to database table"""
         try:
-            # Read CSV file
-            df = pd.read_csv(csv_file_path)
-            print(f"📁 Loaded {len(df)} records from {csv_file_path}")
-            
-            # Convert to database format
-            if table_name == 'shipments':
-                df = self._prepare_shipments_data(df)
-            elif table_name == 'weather_data':
-                df = self._prepare_weather_data(df)
-            elif table_name == 'traffic_data':
-                df = self._prepare_traffic_data(df)
+            # Stream the CSV through the polars lazy engine in batches so memory stays O(chunk).
+            # Column types are inferred from the whole file, not just the first rows, so a
+            # late float/string value cannot fail the import halfway through
+            batches = pl.scan_csv(
+                csv_file_path, try_parse_dates=True, infer_schema_length=None
+            ).collect_batches(chunk_size=chunk_size)
+            total_rows = 0
+            # All chunks share one transaction: a failing chunk rolls back the whole import
+            with self._connection() as conn:
+                for batch in batches:
+                    # Hand each chunk to pandas as Arrow-backed columns
+                    df = batch.to_pandas(use_pyarrow_extension_array=True)
+                    total_rows += self._ingest_dataframe(df, table_name, datetime_format, conn)
             
-            # Insert into database
-            self._insert_dataframe(df, table_name)
-            print(f"✅ Successfully imported {len(df)} records to {table_name} table")
+            print(f"📁 Loaded {total_rows} records from {csv_file_path}")
+            print(f"✅ Successfully imported {total_rows} records to {table_name} table")
             
         except Exception as e:
             print(f"❌ Error importing data: {e}")
     
-    def _prepare_shipments_data(self, df):
+    def _ingest_dataframe(self, df, table_name, datetime_format=None, conn=None):
+        """Prepare an in-memory DataFrame, insert it into the database table and return its row count"""
+        # Convert to database format
+        if table_name == 'shipments':
+            df = self._prepare_shipments_data(df, datetime_format)
+        elif table_name == 'weather_data':
+            df = self._prepare_weather_data(df, datetime_format)
+        elif table_name == 'traffic_data':
+            df = self._prepare_traffic_data(df, datetime_format)
+        
+        # Insert into database
+        self._insert_dataframe(df, table_name, conn)
+        return len(df)
+    
+    def _parse_datetimes(self, series, datetime_format=None):
+        """Parse a datetime column with one explicit format (fast C path)"""
+        import pandas as pd
+        from pandas.tseries.api import guess_datetime_format
+        
+        fmt = datetime_format
+        if fmt is None:
+            sample = series.dropna()
+            if not sample.empty:
+                fmt = guess_datetime_format(str(sample.iloc[0]))
+        fmt = fmt or 'ISO8601'
+        parsed = pd.to_datetime(series, format=fmt, cache=True, errors='coerce')
+        
+        # One format per column: rows that don't match it are an error, never silently NULL
+        unparsed = parsed.isna() & series.notna()
+        if unparsed.any():
+            raise ValueError(
+                f"Datetime values in column {series.name!r} do not match format {fmt!r}: "
+                f"{series[unparsed].head(5).tolist()} (pass datetime_format explicitly)")
+        return parsed
+    
+    def _prepare_shipments_data(self, df, datetime_format=None):
         """Prepare shipments data for database insertion"""
         # Ensure required columns exist
         required_cols = ['tracking_number', 'origin_lat', 'origin_lng', 
@@ -54,53 +119,95 @@ class DataImporter:
         
         # Convert datetime columns
         if 'scheduled_delivery' in df.columns:
-            df['scheduled_delivery'] = pd.to_datetime(df['scheduled_delivery'])
+            df['scheduled_delivery'] = self._parse_datetimes(df['scheduled_delivery'], datetime_format)
         if 'actual_delivery' in df.columns:
-            df['actual_delivery'] = pd.to_datetime(df['actual_delivery'])
+            df['actual_delivery'] = self._parse_datetimes(df['actual_delivery'], datetime_format)
         
         # Add created_at if not present
         if 'created_at' not in df.columns:
             df['created_at'] = datetime.now()
         
-        # Fill missing values
-        df['status'] = df.get('status', 'pending')
-        df['delay_minutes'] = df.get('delay_minutes', 0)
+        # Fill missing values (only touch columns that need it)
+        for col, default in (('status', 'pending'), ('delay_minutes', 0)):
+            if col not in df.columns:
+                df[col] = default
+            else:
+                df[col] = df[col].fillna(default)
+        df['status'] = df['status'].astype('category')
         
         return df
     
-    def _prepare_weather_data(self, df):
+    def _prepare_weather_data(self, df, datetime_format=None):
         """Prepare weather data for database insertion"""
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = self._parse_datetimes(df['timestamp'], datetime_format)
         return df
     
-    def _prepare_traffic_data(self, df):
+    def _prepare_traffic_data(self, df, datetime_format=None):
         """Prepare traffic data for database insertion"""
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = self._parse_datetimes(df['timestamp'], datetime_format)
         return df
     
-    def _insert_dataframe(self, df, table_name):
-        """Insert DataFrame into database table"""
-        # This would use SQLAlchemy or pandas to_sql in production
-        # For now, we'll show the structure
-        print(f"📊 Data structure for {table_name}:")
-        print(df.head())
-        print(f"Columns: {list(df.columns)}")
+    def _adbc_driver(self):
+        """ADBC PostgreSQL DB-API module when installed and the target is Postgres, else None"""
+        if self.engine.dialect.name != 'postgresql':
+            return None
+        try:
+            import adbc_driver_postgresql.dbapi as adbc_pg
+        except ImportError:  # fall back to SQLAlchemy to_sql inserts
+            return None
+        return adbc_pg
+    
+    @contextmanager
+    def _connection(self):
+        """Connection holding one transaction, committed on success and rolled back on error"""
+        adbc_pg = self._adbc_driver()
+        if adbc_pg is None:
+            with self.engine.begin() as conn:
+                yield conn
+            return
+        
+        uri = self.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        with adbc_pg.connect(uri) as con:
+            try:
+                yield con
+            except BaseException:
+                con.rollback()
+                raise
+            con.commit()
+    
+    def _insert_dataframe(self, df, table_name, conn=None):
+        """Insert DataFrame into database table, inside conn's transaction when one is given"""
+        if conn is None:
+            with self._connection() as conn:
+                return self._insert_dataframe(df, table_name, conn)
+        
+        if self._adbc_driver() is not None:
+            import pyarrow as pa
+            
+            # Stream Arrow record batches straight to Postgres, no per-cell serialization
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with conn.cursor() as cur:
+                cur.adbc_ingest(table_name, table, mode='append')
+            return
+        
+        # COPY is the fastest bulk-load path on Postgres (copy_expert is psycopg2 API);
+        # other drivers and databases get multi-row INSERTs
+        method = _psql_copy if self.engine.dialect.driver == 'psycopg2' else 'multi'
+        df.to_sql(table_name, conn, if_exists='append', index=False,
+                  method=method, chunksize=5000)
     
     def import_from_excel(self, excel_file_path, sheet_name='Sheet1', table_name='shipments'):
         """Import data from Excel file"""
+        import pandas as pd
+        
         try:
             df = pd.read_excel(excel_file_path, sheet_name=sheet_name)
             print(f"📁 Loaded {len(df)} records from {excel_file_path}")
             
-            # Convert to CSV temporarily and use CSV import
-            temp_csv = f"temp_{table_name}.csv"
-            df.to_csv(temp_csv, index=False)
-            self.import_from_csv(temp_csv, table_name)
-            
-            # Clean up temp file
-            os.remove(temp_csv)
+            imported = self._ingest_dataframe(df, table_name)
+            print(f"✅ Successfully imported {imported} records to {table_name} table")
             
         except Exception as e:
             print(f"❌ Error importing Excel data: {e}")
@@ -108,7 +215,11 @@ class DataImporter:
     def validate_data_format(self, csv_file_path, expected_format='shipments'):
         """Validate that your data has the correct format"""
         try:
-            df = pd.read_csv(csv_file_path)
+            # Only the header and a 3-row preview are read, not the whole file
+            with open(csv_file_path, newline='') as f:
+                reader = csv.reader(f)
+                columns = next(reader, [])
+                preview = list(itertools.islice(reader, 3))
             
             if expected_format == 'shipments':
                 required_cols = ['tracking_number', 'origin_lat', 'origin_lng', 
@@ -126,17 +237,18 @@ class DataImporter:
                 optional_cols = ['travel_time_minutes', 'distance_km', 'traffic_level']
             
             # Check required columns
-            missing_cols = [col for col in required_cols if col not in df.columns]
+            missing_cols = sorted(set(required_cols) - set(columns), key=required_cols.index)
             if missing_cols:
                 print(f"❌ Missing required columns: {missing_cols}")
                 return False
             
             # Show available columns
             print(f"✅ Data validation passed for {expected_format} format")
-            print(f"📊 Found columns: {list(df.columns)}")
-            print(f"📈 Data shape: {df.shape}")
+            print(f"📊 Found columns: {columns}")
+            print(f"📈 Column count: {len(columns)}")
             print(f"🔍 Sample data:")
-            print(df.head(3))
+            for row in preview:
+                print(f"   {dict(zip(columns, row))}")
             
             return True
             
@@ -5,6 +5,7 @@ Created by: Zayeem Khateeb
 """
 
 import os
+import shutil
 import sys
 from src.dashboard.app import app
 
@@ -19,14 +20,32 @@ def create_production_app():
     
     return app
 
+# Module-level WSGI app so a process manager can import it: gunicorn deploy:production_app
+production_app = create_production_app()
+
 if __name__ == '__main__':
     # Get port from environment variable (for cloud deployment)
     port = int(os.environ.get('PORT', 8050))
     host = os.environ.get('HOST', '0.0.0.0')
+    workers = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+    gunicorn = shutil.which('gunicorn')
     
     print(f"🚀 Starting AI-Powered Shipment Route Optimization System")
     print(f"   Created by: Zayeem Khateeb")
-    print(f"   Running on: http://{host}:{port}")
     
-    production_app = create_production_app()
-    production_app.run(host=host, port=port, debug=False)
+    if gunicorn is None:
+        # No gunicorn on PATH (or Windows): fall back to the built-in server
+        print(f"   Running on: http://{host}:{port} (built-in server; install gunicorn for production)")
+        production_app.run(host=host, port=port, debug=False)
+    else:
+        print(f"   Running on: http://{host}:{port} ({workers} gunicorn workers)")
+        
+        # Replace this process with gunicorn: one worker per core, threaded for I/O-bound callbacks
+        os.execv(gunicorn, [
+            'gunicorn',
+            '--workers', str(workers),
+            '--worker-class', 'gthread',
+            '--threads', '4',
+            '--bind', f'{host}:{port}',
+            'deploy:production_app',
+        ])
@@ -3,10 +3,22 @@ GreenPath CO₂ Emission Calculator
 Calculates CO₂ emissions for different transport modes using IPCC emission factors
 """
 
+import logging
+import sys
+
+import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache
+
+try:
+    from numba import njit, prange
+except ImportError:  # batches fall back to plain NumPy
+    njit = None
+
+logger = logging.getLogger(__name__)
 
 
 class TransportMode(Enum):
@@ -19,14 +31,97 @@ class TransportMode(Enum):
     SHIP_BULK = "ship_bulk"
 
 
-@dataclass
+@dataclass(frozen=True)
 class EmissionFactor:
     """Emission factor data structure"""
+    # Declared by hand rather than dataclass(slots=True), which needs Python 3.10+
+    __slots__ = ('mode', 'factor_kg_co2_per_tonne_km', 'description', 'source')
+
     mode: TransportMode
     factor_kg_co2_per_tonne_km: float
     description: str
     source: str
 
+    # Frozen + __slots__ needs explicit state handling for pickle/copy
+    # (the same methods dataclass(slots=True) generates)
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+# Emission factors based on IPCC guidelines and government data
+_EMISSION_FACTORS: Dict[TransportMode, EmissionFactor] = {
+    TransportMode.ROAD_TRUCK: EmissionFactor(
+        mode=TransportMode.ROAD_TRUCK,
+        factor_kg_co2_per_tonne_km=0.062,  # kg CO₂ per tonne-km
+        description="Heavy duty truck (>32 tonnes)",
+        source="IPCC 2019 Guidelines"
+    ),
+    TransportMode.ROAD_VAN: EmissionFactor(
+        mode=TransportMode.ROAD_VAN,
+        factor_kg_co2_per_tonne_km=0.158,  # Higher per tonne due to smaller capacity
+        description="Light commercial vehicle (<3.5 tonnes)",
+        source="IPCC 2019 Guidelines"
+    ),
+    TransportMode.RAIL: EmissionFactor(
+        mode=TransportMode.RAIL,
+        factor_kg_co2_per_tonne_km=0.022,  # Very efficient
+        description="Electric/diesel freight train",
+        source="IPCC 2019 Guidelines"
+    ),
+    TransportMode.AIR_CARGO: EmissionFactor(
+        mode=TransportMode.AIR_CARGO,
+        factor_kg_co2_per_tonne_km=0.602,  # Highest emissions
+        description="Air cargo freight",
+        source="IPCC 2019 Guidelines"
+    ),
+    TransportMode.SHIP_CONTAINER: EmissionFactor(
+        mode=TransportMode.SHIP_CONTAINER,
+        factor_kg_co2_per_tonne_km=0.011,  # Most efficient
+        description="Container ship",
+        source="IMO Fourth GHG Study 2020"
+    ),
+    TransportMode.SHIP_BULK: EmissionFactor(
+        mode=TransportMode.SHIP_BULK,
+        factor_kg_co2_per_tonne_km=0.008,  # Very efficient for bulk
+        description="Bulk carrier ship",
+        source="IMO Fourth GHG Study 2020"
+    )
+}
+
+# Typical speeds for different modes (km/h), keyed by mode value
+_MODE_SPEEDS: Dict[str, float] = {
+    TransportMode.ROAD_TRUCK.value: 80,
+    TransportMode.ROAD_VAN.value: 70,
+    TransportMode.RAIL.value: 50,
+    TransportMode.AIR_CARGO.value: 800,
+    TransportMode.SHIP_CONTAINER.value: 25,
+    TransportMode.SHIP_BULK.value: 20
+}
+
+
+def _mode_key(transport_mode: Union[TransportMode, str]) -> str:
+    """Canonicalize a transport mode to its interned string value"""
+    if isinstance(transport_mode, TransportMode):
+        return transport_mode.value
+    if isinstance(transport_mode, str):
+        return sys.intern(transport_mode)
+    # Anything else passes through unchanged and fails the mode lookup downstream
+    return transport_mode
+
+# Batches at least this large use the Numba kernel (when installed)
+_NUMBA_MIN_BATCH = 10_000
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _calc_kernel(dist, weight, mode_code, factor_lut, out):
+        """Fused CO₂ = Distance × Weight × EmissionFactor over a whole batch"""
+        for i in prange(dist.shape[0]):
+            out[i] = dist[i] * weight[i] * factor_lut[mode_code[i]]
+
 
 class EmissionCalculator:
     """
@@ -36,57 +131,39 @@ class EmissionCalculator:
 
     def __init__(self):
         """Initialize with IPCC and government emission factors"""
-        self.emission_factors = self._load_emission_factors()
-        # Debug: Print loaded factors
-        print(f"Loaded emission factors: {list(self.emission_factors.keys())}")
-
-    def _load_emission_factors(self) -> Dict[TransportMode, EmissionFactor]:
-        """Load emission factors based on IPCC guidelines and government data"""
-        factors = {
-            TransportMode.ROAD_TRUCK: EmissionFactor(
-                mode=TransportMode.ROAD_TRUCK,
-                factor_kg_co2_per_tonne_km=0.062,  # kg CO₂ per tonne-km
-                description="Heavy duty truck (>32 tonnes)",
-                source="IPCC 2019 Guidelines"
-            ),
-            TransportMode.ROAD_VAN: EmissionFactor(
-                mode=TransportMode.ROAD_VAN,
-                factor_kg_co2_per_tonne_km=0.158,  # Higher per tonne due to smaller capacity
-                description="Light commercial vehicle (<3.5 tonnes)",
-                source="IPCC 2019 Guidelines"
-            ),
-            TransportMode.RAIL: EmissionFactor(
-                mode=TransportMode.RAIL,
-                factor_kg_co2_per_tonne_km=0.022,  # Very efficient
-                description="Electric/diesel freight train",
-                source="IPCC 2019 Guidelines"
-            ),
-            TransportMode.AIR_CARGO: EmissionFactor(
-                mode=TransportMode.AIR_CARGO,
-                factor_kg_co2_per_tonne_km=0.602,  # Highest emissions
-                description="Air cargo freight",
-                source="IPCC 2019 Guidelines"
-            ),
-            TransportMode.SHIP_CONTAINER: EmissionFactor(
-                mode=TransportMode.SHIP_CONTAINER,
-                factor_kg_co2_per_tonne_km=0.011,  # Most efficient
-                description="Container ship",
-                source="IMO Fourth GHG Study 2020"
-            ),
-            TransportMode.SHIP_BULK: EmissionFactor(
-                mode=TransportMode.SHIP_BULK,
-                factor_kg_co2_per_tonne_km=0.008,  # Very efficient for bulk
-                description="Bulk carrier ship",
-                source="IMO Fourth GHG Study 2020"
-            )
-        }
-        return factors
+        self.emission_factors = _EMISSION_FACTORS
+        logger.debug("Loaded emission factors: %s", list(self.emission_factors))
+
+        # Parallel per-mode arrays indexed by each mode's position in TransportMode;
+        # the EmissionFactor entries are only kept for metadata lookups. Internally
+        # modes are keyed by their string value (see _mode_key)
+        modes = list(TransportMode)
+        self._modes_arr = np.array([mode.value for mode in modes])
+        self._factors_arr = np.array(
+            [self.emission_factors[mode].factor_kg_co2_per_tonne_km for mode in modes],
+            dtype=np.float64
+        )
+        self._desc_arr = np.array([self.emission_factors[mode].description for mode in modes])
+        self._source_arr = np.array([self.emission_factors[mode].source for mode in modes])
+        self._value_to_idx = {mode.value: i for i, mode in enumerate(modes)}
+
+        # Display table of the factors, built column-wise once
+        self._factors_df = pd.DataFrame({
+            'transport_mode': self._modes_arr,
+            'emission_factor_kg_co2_per_tonne_km': self._factors_arr,
+            'description': self._desc_arr,
+            'source': self._source_arr
+        }).sort_values('emission_factor_kg_co2_per_tonne_km').reset_index(drop=True)
+
+        # Per-instance memo of the pure (distance, weight, mode) calculation
+        self._calc_cached = lru_cache(maxsize=4096)(self._calc_emissions)
+        self._compare_cached = lru_cache(maxsize=256)(self._compare_impl)
 
     def calculate_emissions(
             self,
             distance_km: float,
             weight_tonnes: float,
-            transport_mode: TransportMode
+            transport_mode: Union[TransportMode, str]
     ) -> Dict[str, float]:
         """
         Calculate CO₂ emissions for a shipment
@@ -94,40 +171,119 @@ class EmissionCalculator:
         Args:
             distance_km: Distance in kilometers
             weight_tonnes: Weight in tonnes
-            transport_mode: Mode of transport
+            transport_mode: Mode of transport (TransportMode or its string value)
 
         Returns:
-            Dictionary with emission calculations
+            Dictionary with unrounded emission calculations (see format_emissions)
         """
-        if transport_mode not in self.emission_factors:
-            # Debug: print available keys and the requested mode
-            available_modes = list(self.emission_factors.keys())
-            print(f"Available modes: {available_modes}")
-            print(f"Requested mode: {transport_mode} (type: {type(transport_mode)})")
+        mode_key = _mode_key(transport_mode)
+        idx = self._value_to_idx.get(mode_key)
+        if idx is None:
             raise ValueError(
-                f"Unsupported transport mode: {transport_mode}. Available: {[m.value for m in available_modes]}")
+                f"Unsupported transport mode: {transport_mode!r}. "
+                f"Available: {[m.value for m in self.emission_factors]}")
 
-        factor = self.emission_factors[transport_mode]
-
-        # Core calculation: CO₂ = Distance × Weight × EmissionFactor
-        co2_kg = distance_km * weight_tonnes * factor.factor_kg_co2_per_tonne_km
-        co2_tonnes = co2_kg / 1000
+        co2_kg, co2_tonnes, factor = self._calc_cached(distance_km, weight_tonnes, idx)
 
         return {
-            'co2_emissions_kg': round(co2_kg, 3),
-            'co2_emissions_tonnes': round(co2_tonnes, 6),
+            'co2_emissions_kg': co2_kg,
+            'co2_emissions_tonnes': co2_tonnes,
             'distance_km': distance_km,
             'weight_tonnes': weight_tonnes,
-            'transport_mode': transport_mode.value,
-            'emission_factor': factor.factor_kg_co2_per_tonne_km,
-            'emission_factor_source': factor.source
+            'transport_mode': mode_key,
+            'emission_factor': factor,
+            'emission_factor_source': str(self._source_arr[idx])
         }
 
+    def _calc_emissions(
+            self,
+            distance_km: float,
+            weight_tonnes: float,
+            mode_idx: int
+    ) -> Tuple[float, float, float]:
+        """Return (co2_kg, co2_tonnes, factor) for a resolved mode index"""
+        factor = float(self._factors_arr[mode_idx])
+
+        # Core calculation: CO₂ = Distance × Weight × EmissionFactor
+        co2_kg = distance_km * weight_tonnes * factor
+        co2_tonnes = co2_kg / 1000
+
+        return co2_kg, co2_tonnes, factor
+
+    def cache_info(self):
+        """Hit/miss statistics of the calculate_emissions memo"""
+        return self._calc_cached.cache_info()
+
+    def calculate_emissions_batch(
+            self,
+            distances_km,
+            weights_tonnes,
+            transport_modes
+    ) -> pd.DataFrame:
+        """
+        Calculate CO₂ emissions for many shipments at once
+
+        Args:
+            distances_km: Array-like of distances in kilometers
+            weights_tonnes: Array-like of weights in tonnes
+            transport_modes: Array-like of TransportMode members or their string values
+
+        Returns:
+            DataFrame with one row per shipment and the same fields as calculate_emissions
+        """
+        mode_values = pd.Series(
+            [_mode_key(mode) for mode in transport_modes],
+            dtype=object
+        )
+        codes = mode_values.map(self._value_to_idx).to_numpy(dtype=np.float64)
+        if np.isnan(codes).any():
+            unknown = sorted(set(mode_values[np.isnan(codes)]))
+            raise ValueError(
+                f"Unsupported transport mode(s): {unknown}. Available: {list(self._value_to_idx)}")
+        codes = codes.astype(np.int8)
+
+        # Scalars broadcast against the batch; mismatched lengths are rejected up front
+        # (the Numba kernel does not bounds-check)
+        try:
+            distances, weights, codes = np.broadcast_arrays(
+                np.asarray(distances_km, dtype=np.float64),
+                np.asarray(weights_tonnes, dtype=np.float64),
+                codes
+            )
+        except ValueError:
+            raise ValueError(
+                "distances_km, weights_tonnes and transport_modes must have matching lengths "
+                f"(got {np.shape(distances_km)}, {np.shape(weights_tonnes)}, {codes.shape})"
+            ) from None
+        if distances.ndim != 1:
+            raise ValueError(f"Expected one-dimensional inputs, got shape {distances.shape}")
+        factors = self._factors_arr[codes]
+
+        # Core calculation: CO₂ = Distance × Weight × EmissionFactor
+        if njit is not None and distances.shape[0] >= _NUMBA_MIN_BATCH:
+            co2_kg = np.empty_like(distances)
+            _calc_kernel(
+                np.ascontiguousarray(distances), np.ascontiguousarray(weights),
+                np.ascontiguousarray(codes), self._factors_arr, co2_kg
+            )
+        else:
+            co2_kg = distances * weights * factors
+
+        return pd.DataFrame({
+            'co2_emissions_kg': co2_kg,
+            'co2_emissions_tonnes': co2_kg / 1000,
+            'distance_km': distances,
+            'weight_tonnes': weights,
+            'transport_mode': self._modes_arr[codes],
+            'emission_factor': factors,
+            'emission_factor_source': self._source_arr[codes]
+        })
+
     def compare_transport_modes(
             self,
             distance_km: float,
             weight_tonnes: float,
-            modes: Optional[List[TransportMode]] = None
+            modes: Optional[List[Union[TransportMode, str]]] = None
     ) -> pd.DataFrame:
         """
         Compare CO₂ emissions across different transport modes
@@ -135,35 +291,55 @@ class EmissionCalculator:
         Args:
             distance_km: Distance in kilometers
             weight_tonnes: Weight in tonnes
-            modes: List of transport modes to compare (default: all)
+            modes: Transport modes (or their string values) to compare (default: all)
 
         Returns:
-            DataFrame with comparison results
+            DataFrame with comparison results (memoized on the exact inputs)
         """
+        result = self._compare_cached(
+            distance_km,
+            weight_tonnes,
+            None if modes is None else tuple(_mode_key(mode) for mode in modes)
+        )
+        # Shallow copy so callers can add/replace columns without touching the cached frame
+        return result.copy(deep=False)
+
+    def _compare_impl(
+            self,
+            distance_km: float,
+            weight_tonnes: float,
+            modes: Optional[Tuple[str, ...]]
+    ) -> pd.DataFrame:
+        """Uncached implementation of compare_transport_modes"""
         if modes is None:
-            modes = list(TransportMode)
-
-        results = []
-        for mode in modes:
-            try:
-                emissions = self.calculate_emissions(distance_km, weight_tonnes, mode)
-                results.append({
-                    'transport_mode': mode.value,
-                    'co2_emissions_kg': emissions['co2_emissions_kg'],
-                    'emission_factor': emissions['emission_factor'],
-                    'description': self.emission_factors[mode].description
-                })
-            except ValueError:
-                continue
-
-        df = pd.DataFrame(results)
-        if not df.empty:
-            df = df.sort_values('co2_emissions_kg')
-            df['emission_rank'] = range(1, len(df) + 1)
-            df['emission_difference_vs_best'] = df['co2_emissions_kg'] - df['co2_emissions_kg'].min()
-            df['emission_percentage_vs_best'] = (
-                    (df['co2_emissions_kg'] / df['co2_emissions_kg'].min() - 1) * 100
-            ).round(1)
+            idx = np.arange(len(self._modes_arr))
+        else:
+            idx = np.array(
+                [self._value_to_idx[mode] for mode in modes if mode in self._value_to_idx],
+                dtype=np.intp
+            )
+
+        if idx.size == 0:
+            return pd.DataFrame()
+
+        # CO₂ for every mode in one vector multiply, then order by emissions
+        co2 = distance_km * weight_tonnes * self._factors_arr[idx]
+        order = np.argsort(co2, kind='stable')
+        idx, co2 = idx[order], co2[order]
+
+        df = pd.DataFrame({
+            'transport_mode': self._modes_arr[idx],
+            'co2_emissions_kg': co2,
+            'emission_factor': self._factors_arr[idx],
+            'description': self._desc_arr[idx]
+        })
+        # co2 is already sorted, so the best (minimum) value is its first element
+        best = co2[0]
+        df['emission_rank'] = np.arange(1, len(df) + 1)
+        df['emission_difference_vs_best'] = co2 - best
+        # A zero-emission best (zero distance or weight) yields NaN/inf rather than a warning
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['emission_percentage_vs_best'] = (co2 / best - 1) * 100
 
         return df
 
@@ -194,97 +370,130 @@ class EmissionCalculator:
 
     def get_emission_factors_table(self) -> pd.DataFrame:
         """Get emission factors as a DataFrame for display"""
-        data = []
-        for mode, factor in self.emission_factors.items():
-            data.append({
-                'transport_mode': mode.value,
-                'emission_factor_kg_co2_per_tonne_km': factor.factor_kg_co2_per_tonne_km,
-                'description': factor.description,
-                'source': factor.source
-            })
+        return self._factors_df.copy()
 
-        return pd.DataFrame(data).sort_values('emission_factor_kg_co2_per_tonne_km')
+
+def format_emissions(result: Dict, digits_kg: int = 3, digits_tonnes: int = 6) -> Dict:
+    """
+    Round a calculate_emissions result for display
+
+    Args:
+        result: Dictionary returned by EmissionCalculator.calculate_emissions
+        digits_kg: Decimal places for co2_emissions_kg
+        digits_tonnes: Decimal places for co2_emissions_tonnes
+
+    Returns:
+        Copy of the result with rounded emission values
+    """
+    formatted = dict(result)
+    formatted['co2_emissions_kg'] = round(result['co2_emissions_kg'], digits_kg)
+    formatted['co2_emissions_tonnes'] = round(result['co2_emissions_tonnes'], digits_tonnes)
+    return formatted
+
+
+_SHARED_CALCULATOR: Optional[EmissionCalculator] = None
+
+
+def _shared_calculator() -> EmissionCalculator:
+    """Return the process-wide EmissionCalculator, creating it on first use"""
+    global _SHARED_CALCULATOR
+    if _SHARED_CALCULATOR is None:
+        _SHARED_CALCULATOR = EmissionCalculator()
+    return _SHARED_CALCULATOR
 
 
 class EmissionOptimizer:
     """Optimize transport mode selection for minimum emissions"""
 
     def __init__(self):
-        self.calculator = EmissionCalculator()
+        self.calculator = _shared_calculator()
+        self._greenest_cached = lru_cache(maxsize=1024)(self._find_greenest)
 
     def find_greenest_option(
             self,
             distance_km: float,
             weight_tonnes: float,
-            available_modes: List[TransportMode],
+            available_modes: List[Union[TransportMode, str]],
             max_time_penalty_percent: float = 10.0
     ) -> Dict:
         """
         Find the transport mode with lowest emissions within time constraints
 
+        Results are memoized on the exact inputs, including the order of
+        available_modes (ties go to the mode listed first).
+
         Args:
             distance_km: Distance in kilometers
             weight_tonnes: Weight in tonnes
-            available_modes: Available transport modes
+            available_modes: Available transport modes (TransportMode members or string values)
             max_time_penalty_percent: Maximum acceptable time penalty for green option
 
         Returns:
             Dictionary with recommendation
         """
-        # Typical speeds for different modes (km/h)
-        mode_speeds = {
-            TransportMode.ROAD_TRUCK: 80,
-            TransportMode.ROAD_VAN: 70,
-            TransportMode.RAIL: 50,
-            TransportMode.AIR_CARGO: 800,
-            TransportMode.SHIP_CONTAINER: 25,
-            TransportMode.SHIP_BULK: 20
-        }
-
-        options = []
-        for mode in available_modes:
-            emissions = self.calculator.calculate_emissions(distance_km, weight_tonnes, mode)
-            speed = mode_speeds.get(mode, 50)
-            travel_time_hours = distance_km / speed
+        result = self._greenest_cached(
+            distance_km,
+            weight_tonnes,
+            tuple(_mode_key(mode) for mode in available_modes),
+            max_time_penalty_percent
+        )
+
+        # Hand out a copy so callers cannot mutate the cached recommendation
+        result = dict(result)
+        if 'all_options' in result:
+            result['all_options'] = [dict(opt) for opt in result['all_options']]
+        return result
+
+    def cache_info(self):
+        """Hit/miss statistics of the find_greenest_option memo"""
+        return self._greenest_cached.cache_info()
+
+    def _find_greenest(
+            self,
+            distance_km: float,
+            weight_tonnes: float,
+            mode_values: Tuple[str, ...],
+            max_time_penalty_percent: float
+    ) -> Dict:
+        """Uncached implementation of find_greenest_option"""
+        n = len(mode_values)
 
-            options.append({
-                'mode': mode,
-                'co2_emissions_kg': emissions['co2_emissions_kg'],
-                'travel_time_hours': travel_time_hours,
-                'emission_factor': emissions['emission_factor']
-            })
+        if n == 0:
+            return {'error': 'No available transport modes'}
 
-        # Sort by emissions (lowest first)
-        options.sort(key=lambda x: x['co2_emissions_kg'])
+        emis = np.empty(n)
+        times = np.empty(n)
+        for i, mode in enumerate(mode_values):
+            emis[i] = self.calculator.calculate_emissions(distance_km, weight_tonnes, mode)['co2_emissions_kg']
+            times[i] = distance_km / _MODE_SPEEDS.get(mode, 50)
 
-        if not options:
-            return {'error': 'No available transport modes'}
+        # Order by emissions (lowest first); fastest is the first minimum-time mode in that order
+        order = np.argsort(emis, kind='stable')
+        greenest_idx = int(order[0])
+        fastest_idx = int(order[times[order].argmin()])
 
-        greenest = options[0]
-        fastest = min(options, key=lambda x: x['travel_time_hours'])
+        greenest_emis, fastest_emis = float(emis[greenest_idx]), float(emis[fastest_idx])
+        greenest_time, fastest_time = float(times[greenest_idx]), float(times[fastest_idx])
 
         # Check if greenest option meets time constraint
-        time_penalty = (greenest['travel_time_hours'] - fastest['travel_time_hours']) / fastest[
-            'travel_time_hours'] * 100
+        time_penalty = (greenest_time - fastest_time) / fastest_time * 100
 
         recommendation = {
-            'recommended_mode': greenest['mode'].value,
-            'co2_emissions_kg': greenest['co2_emissions_kg'],
-            'travel_time_hours': greenest['travel_time_hours'],
+            'recommended_mode': mode_values[greenest_idx],
+            'co2_emissions_kg': greenest_emis,
+            'travel_time_hours': greenest_time,
             'is_within_time_constraint': time_penalty <= max_time_penalty_percent,
             'time_penalty_percent': round(time_penalty, 1),
-            'emission_savings_vs_fastest': round(
-                fastest['co2_emissions_kg'] - greenest['co2_emissions_kg'], 2
-            ),
+            'emission_savings_vs_fastest': round(fastest_emis - greenest_emis, 2),
             'emission_reduction_percent': round(
-                (1 - greenest['co2_emissions_kg'] / fastest['co2_emissions_kg']) * 100, 1
-            ) if fastest['co2_emissions_kg'] > 0 else 0,
+                (1 - greenest_emis / fastest_emis) * 100, 1
+            ) if fastest_emis > 0 else 0,
             'all_options': [
                 {
-                    'mode': opt['mode'].value,
-                    'co2_emissions_kg': opt['co2_emissions_kg'],
-                    'travel_time_hours': round(opt['travel_time_hours'], 1)
-                } for opt in options
+                    'mode': mode_values[i],
+                    'co2_emissions_kg': float(emis[i]),
+                    'travel_time_hours': round(float(times[i]), 1)
+                } for i in order.tolist()
             ]
         }
 
@@ -6,20 +6,19 @@ Main application entry point for demonstration and testing
 
 import sys
 import os
-import pandas as pd
 from datetime import datetime
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from data_pipeline.data_collector import DataCollector
-from data_pipeline.data_processor import DataProcessor
-from ml_models.delay_predictor import DelayPredictor, ModelEvaluator
-from route_optimizer.route_optimizer import RouteOptimizer, RouteAnalyzer
-from utils.monitoring import ShipmentMonitor, PerformanceAnalyzer
-
 def demonstrate_system():
     """Demonstrate the complete AI-powered shipment optimization system"""
+    # Heavy (pandas/ML) imports are deferred so the usage screen starts instantly
+    from data_pipeline.data_collector import DataCollector
+    from data_pipeline.data_processor import DataProcessor
+    from ml_models.delay_predictor import DelayPredictor
+    from route_optimizer.route_optimizer import RouteOptimizer
+    from utils.monitoring import ShipmentMonitor, PerformanceAnalyzer
     
     print("=" * 60)
     print("AI-POWERED SHIPMENT ROUTE OPTIMIZATION & DELAY PREDICTION")
@@ -114,10 +113,10 @@ def demonstrate_system():
         risk_predictions = delay_predictor.predict_delay_risk(X_sample)
         
         print("Sample delay risk predictions:")
-        for i in range(min(5, len(risk_predictions))):
-            tracking = sample_shipments.iloc[i]['tracking_number']
-            risk = risk_predictions.iloc[i]['risk_category']
-            prob = risk_predictions.iloc[i]['delay_probability']
+        trackings = sample_shipments['tracking_number'].to_numpy()[:5]
+        risks = risk_predictions['risk_category'].to_numpy()[:5]
+        probs = risk_predictions['delay_probability'].to_numpy()[:5]
+        for tracking, risk, prob in zip(trackings, risks, probs):
             print(f"  {tracking}: {risk} ({prob:.1%} probability)")
     
     # Step 5: Real-time Monitoring
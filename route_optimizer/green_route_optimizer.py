@@ -1,6 +1,21 @@
 # route_optimizer/green_route_optimizer.py
 
-import math
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0
+DEFAULT_EMISSION_FACTOR = 0.21  # example emission factor (kg CO₂ per km)
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """
+    Great-circle central angle (radians) between coordinates given in degrees.
+    Built from NumPy ufuncs, so it accepts scalars or whole arrays.
+    """
+    lat1, lon1, lat2, lon2 = np.radians(lat1), np.radians(lon1), np.radians(lat2), np.radians(lon2)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
 
 class GreenRouteOptimizer:
     """
@@ -11,17 +26,31 @@ class GreenRouteOptimizer:
     def __init__(self):
         pass
 
-    def optimize(self, start, end, mode="driving"):
+    def optimize(self, start, end, mode="driving", emission_factor=DEFAULT_EMISSION_FACTOR):
         """
-        Returns a mock optimized route result.
+        Returns a mock optimized route result for (lat, lng) start/end points.
         Replace this with real API calls if needed.
         """
-        distance_km = math.dist(start, end)  # Euclidean distance (approximation)
+        distance_km = float(_haversine(start[0], start[1], end[0], end[1]) * EARTH_RADIUS_KM)
         optimized_route = {
             "start": start,
             "end": end,
             "mode": mode,
             "optimized_distance_km": round(distance_km, 2),
-            "estimated_emission_kg": round(distance_km * 0.21, 3)  # example emission factor
+            "estimated_emission_kg": round(distance_km * emission_factor, 3)
         }
         return optimized_route
+
+    def optimize_many(self, starts, ends, mode="driving", emission_factor=DEFAULT_EMISSION_FACTOR):
+        """
+        Score many (lat, lng) start/end pairs in one vectorized pass.
+        starts and ends are array-likes of shape (N, 2); returns one DataFrame row per pair.
+        """
+        starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+        dists = _haversine(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1]) * EARTH_RADIUS_KM
+        return pd.DataFrame({
+            "mode": mode,
+            "distance_km": dists.round(2),
+            "emission_kg": (dists * emission_factor).round(3)
+        })
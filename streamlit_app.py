@@ -5,13 +5,10 @@ Professional Streamlit Frontend with Eco-Friendly Design
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import requests
+import plotly.io as pio
 import sys
 import os
-from datetime import datetime, timedelta
 import numpy as np
 
 # Add src directory to path
@@ -20,6 +17,19 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 from emissions.emission_calculator import EmissionCalculator, TransportMode
 from route_optimizer.green_route_optimizer import GreenRouteOptimizer
 
+# Transport mode lookups and navigation labels shared by the page functions; like the
+# rest of the script they are rebuilt on every run (they are tiny)
+_MODE_BY_VALUE = {mode.value: mode for mode in TransportMode}
+_MODE_VALUES = [mode.value for mode in TransportMode]
+
+NAV_OPTIONS = (
+    "🏠 Dashboard",
+    "🧮 Emission Calculator",
+    "🗺️ Route Optimizer",
+    "📊 Scenario Analysis",
+    "📈 Analytics"
+)
+
 # Page configuration
 st.set_page_config(
     page_title="GreenPath - CO₂ Emission Tracker",
@@ -28,6 +38,23 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Shared figure layout so charts only carry their own overrides; pio.templates is
+# process-global, so the registration itself only needs to happen once per process
+@st.cache_resource
+def _register_plotly_template():
+    pio.templates["greenpath"] = go.layout.Template(layout=dict(
+        height=400,
+        font=dict(family="Inter"),
+        colorway=["#2ECC71", "#E74C3C", "#3498DB"]
+    ))
+    pio.templates.default = "plotly_white+greenpath"
+
+_register_plotly_template()
+
+# Overview charts are read-only; only the comparison charts keep hover/zoom handlers
+STATIC_CFG = {"staticPlot": True, "displaylogo": False}
+INTERACTIVE_CFG = {"displayModeBar": False, "displaylogo": False}
+
 # Custom CSS for eco-friendly theme
 st.markdown("""
 <style>
@@ -52,6 +79,46 @@ st.markdown("""
         margin-bottom: 1rem;
     }
     
+    .metric-grid {
+        display: grid;
+        grid-template-columns: repeat(4, 1fr);
+        gap: 1rem;
+    }
+    
+    .route-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fill, minmax(220px, 1fr));
+        gap: 1rem;
+    }
+    
+    .route-card h4 {
+        color: #2ECC71;
+        margin: 0 0 0.5rem 0;
+    }
+    
+    .route-card p {
+        margin: 0;
+        color: #34495E;
+    }
+    
+    .eco-table {
+        width: 100%;
+        border-collapse: collapse;
+        font-size: 0.9rem;
+    }
+    
+    .eco-table th {
+        background-color: #E8F5E8;
+        color: #2C3E50;
+        text-align: left;
+        padding: 6px 8px;
+    }
+    
+    .eco-table td {
+        border-top: 1px solid #E0E0E0;
+        padding: 6px 8px;
+    }
+    
     .green-button {
         background-color: #2ECC71;
         color: white;
@@ -158,6 +225,64 @@ def init_components():
 
 calculator, optimizer = init_components()
 
+# Bound method handles, looked up once per run instead of per call
+_calc_emissions = calculator.calculate_emissions
+_compare_modes = calculator.compare_transport_modes
+_carbon_tax = calculator.calculate_carbon_tax_cost
+
+# Page-local sample/reference data, memoized across reruns
+@st.cache_data
+def _modes_data():
+    """Sample data for transport mode comparison: (mode names, CO₂ kg)"""
+    return (
+        np.array(['Road Truck', 'Rail', 'Ship Container', 'Air Cargo']),
+        np.array([62, 22, 11, 602], dtype=np.float64)
+    )
+
+@st.cache_data
+def _trend_data():
+    """Sample monthly emission trend data: (dates, emissions, target)"""
+    emissions = np.array([15.2, 14.8, 13.9, 13.1, 12.8, 12.3, 11.9, 11.5, 12.5])
+    dates = pd.date_range(start='2024-01-01', periods=len(emissions), freq='M').to_numpy()
+    return dates, emissions, np.full(len(emissions), 14.0)
+
+@st.cache_data
+def _regional_df():
+    """Sample regional analytics data"""
+    return pd.DataFrame({
+        'Region': pd.Categorical(['North America', 'Europe', 'Asia Pacific', 'Latin America']),
+        'Emissions (tonnes)': [45.2, 32.1, 28.7, 15.3],
+        'Shipments': [450, 320, 380, 180],
+        'Avg Distance (km)': [1200, 800, 950, 600]
+    })
+
+@st.cache_data
+def _comparison_df(distance, weight):
+    """Transport mode comparison table for the calculator inputs"""
+    # Category dtype ships the mode names to the browser once, as an Arrow dictionary
+    comparison_df = _compare_modes(distance, weight)
+    return comparison_df.assign(transport_mode=comparison_df['transport_mode'].astype('category'))
+
+@st.cache_data
+def _factors_html():
+    """Static emission-factor reference table, pre-rendered as HTML"""
+    return calculator.get_emission_factors_table().to_html(index=False, classes="eco-table")
+
+@st.cache_data
+def _regional_html():
+    """Static regional analytics table, pre-rendered as HTML"""
+    return _regional_df().to_html(index=False, classes="eco-table")
+
+@st.cache_resource
+def _green_candidates():
+    """Candidate green modes for scenario analysis and their emission factors"""
+    modes = [TransportMode.ROAD_TRUCK, TransportMode.RAIL, TransportMode.SHIP_CONTAINER]
+    factors = np.array(
+        [calculator.emission_factors[mode].factor_kg_co2_per_tonne_km for mode in modes],
+        dtype=np.float64
+    )
+    return modes, factors
+
 # Header
 st.markdown("""
 <div class="main-header">
@@ -180,17 +305,9 @@ with st.sidebar:
     st.markdown("### 📍 Navigate")
     
     # Navigation with better visibility
-    nav_options = {
-        "🏠 Dashboard": "Dashboard",
-        "🧮 Emission Calculator": "Emission Calculator", 
-        "🗺️ Route Optimizer": "Route Optimizer",
-        "📊 Scenario Analysis": "Scenario Analysis",
-        "📈 Analytics": "Analytics"
-    }
-    
     page = st.selectbox(
         "Choose a page:",
-        options=list(nav_options.keys()),
+        options=NAV_OPTIONS,
         label_visibility="collapsed",
         key="navigation"
     )
@@ -205,48 +322,41 @@ with st.sidebar:
     with col2:
         st.metric("Routes Optimized", "156", "↑ 15%")
 
-# Main content based on selected page
-if page == "🏠 Dashboard":
-    st.markdown("## 📊 Emission Overview Dashboard")
+# Page bodies, one function per page so only the selected one runs
+def _page_dashboard():
+    # Imported here: plotly_resampler pulls in dash, which only the trend chart needs
+    try:
+        from plotly_resampler import FigureResampler
+    except ImportError:  # time series render as plain go.Figure
+        FigureResampler = None
     
-    # Top KPIs
-    col1, col2, col3, col4 = st.columns(4)
+    st.markdown("## 📊 Emission Overview Dashboard")
     
-    with col1:
-        st.markdown("""
+    # Top KPIs - one grid element instead of four columns of markdown
+    st.markdown("""
+    <div class="metric-grid">
         <div class="metric-card">
             <h3 style="color: #2ECC71; margin: 0;">12.5t</h3>
             <p style="margin: 0; color: #7F8C8D;">Total CO₂ Emissions</p>
             <small style="color: #E74C3C;">↓ 18% vs last month</small>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
         <div class="metric-card">
             <h3 style="color: #2ECC71; margin: 0;">22%</h3>
             <p style="margin: 0; color: #7F8C8D;">Emission Reduction</p>
             <small style="color: #27AE60;">Green routes adopted</small>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        st.markdown("""
         <div class="metric-card">
             <h3 style="color: #2ECC71; margin: 0;">0.08</h3>
             <p style="margin: 0; color: #7F8C8D;">Avg. Emission/Shipment (kg)</p>
             <small style="color: #27AE60;">Industry best practice</small>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        st.markdown("""
         <div class="metric-card">
             <h3 style="color: #2ECC71; margin: 0;">$1,250</h3>
             <p style="margin: 0; color: #7F8C8D;">Carbon Tax Savings</p>
             <small style="color: #27AE60;">Monthly estimate</small>
         </div>
-        """, unsafe_allow_html=True)
+    </div>
+    """, unsafe_allow_html=True)
     
     # Charts
     col1, col2 = st.columns(2)
@@ -254,55 +364,53 @@ if page == "🏠 Dashboard":
     with col1:
         st.markdown("### 🚛 Emissions by Transport Mode")
         
-        # Sample data for transport mode comparison
-        modes_data = pd.DataFrame({
-            'Transport Mode': ['Road Truck', 'Rail', 'Ship Container', 'Air Cargo'],
-            'CO₂ Emissions (kg)': [62, 22, 11, 602],
-            'Usage %': [45, 30, 20, 5]
-        })
+        mode_names, mode_co2 = _modes_data()
         
-        fig = px.bar(
-            modes_data, 
-            x='Transport Mode', 
-            y='CO₂ Emissions (kg)',
-            color='CO₂ Emissions (kg)',
-            color_continuous_scale=['#2ECC71', '#E74C3C'],
-            title="Emission Factors by Transport Mode"
+        fig = go.Figure(go.Bar(
+            x=mode_names,
+            y=mode_co2,
+            marker=dict(
+                color=mode_co2,
+                colorscale=[[0, '#2ECC71'], [1, '#E74C3C']],
+                showscale=True
+            )
+        ))
+        fig.update_layout(
+            title="Emission Factors by Transport Mode",
+            xaxis_title='Transport Mode',
+            yaxis_title='CO₂ Emissions (kg)',
+            showlegend=False
         )
-        fig.update_layout(showlegend=False, height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=STATIC_CFG)
     
     with col2:
         st.markdown("### 📈 Emission Trends")
         
-        # Sample trend data
-        emissions_data = [15.2, 14.8, 13.9, 13.1, 12.8, 12.3, 11.9, 11.5, 12.5]
-        dates = pd.date_range(start='2024-01-01', periods=len(emissions_data), freq='M')
-        trend_data = pd.DataFrame({
-            'Date': dates,
-            'Emissions (tonnes)': emissions_data,
-            'Target': [14.0] * len(emissions_data)
-        })
+        trend_dates, trend_emissions, trend_target = _trend_data()
         
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=trend_data['Date'], 
-            y=trend_data['Emissions (tonnes)'],
-            mode='lines+markers',
-            name='Actual Emissions',
-            line=dict(color='#2ECC71', width=3)
-        ))
-        fig.add_trace(go.Scatter(
-            x=trend_data['Date'], 
-            y=trend_data['Target'],
-            mode='lines',
-            name='Target',
-            line=dict(color='#E74C3C', dash='dash')
-        ))
-        fig.update_layout(title="Monthly Emission Trends", height=400)
-        st.plotly_chart(fig, use_container_width=True)
+        trend_series = [
+            (go.Scattergl(mode='lines+markers', name='Actual Emissions', line=dict(color='#2ECC71', width=3)),
+             trend_emissions),
+            (go.Scattergl(mode='lines', name='Target', line=dict(color='#E74C3C', dash='dash')),
+             trend_target)
+        ]
+        
+        # LTTB-downsample the series to the viewport; other charts stay plain go.Figure
+        fig = (
+            FigureResampler(go.Figure(), default_n_shown_samples=2000)
+            if FigureResampler is not None else go.Figure()
+        )
+        for trace, values in trend_series:
+            if FigureResampler is not None:
+                fig.add_trace(trace, hf_x=trend_dates, hf_y=values)
+            else:
+                trace.update(x=trend_dates, y=values)
+                fig.add_trace(trace)
+        fig.update_layout(title="Monthly Emission Trends")
+        st.plotly_chart(fig, use_container_width=True, theme=None, config=STATIC_CFG)
 
-elif page == "🧮 Emission Calculator":
+@st.fragment  # form submits rerun only this page body
+def _page_calculator():
     st.markdown("## 🧮 CO₂ Emission Calculator")
     st.markdown("Calculate CO₂ emissions using the formula: **CO₂ = Distance × Weight × EmissionFactor**")
     
@@ -320,7 +428,7 @@ elif page == "🧮 Emission Calculator":
             with col_b:
                 transport_mode = st.selectbox(
                     "Transport Mode",
-                    options=[mode.value for mode in TransportMode],
+                    options=_MODE_VALUES,
                     format_func=lambda x: x.replace('_', ' ').title()
                 )
             
@@ -329,21 +437,9 @@ elif page == "🧮 Emission Calculator":
         if calculate_btn:
             try:
                 # Convert string to TransportMode enum
-                mode_mapping = {
-                    'road_truck': TransportMode.ROAD_TRUCK,
-                    'road_van': TransportMode.ROAD_VAN,
-                    'rail': TransportMode.RAIL,
-                    'air_cargo': TransportMode.AIR_CARGO,
-                    'ship_container': TransportMode.SHIP_CONTAINER,
-                    'ship_bulk': TransportMode.SHIP_BULK
-                }
-                
-                if transport_mode in mode_mapping:
-                    mode = mode_mapping[transport_mode]
-                else:
-                    mode = TransportMode(transport_mode)
+                mode = _MODE_BY_VALUE.get(transport_mode) or TransportMode(transport_mode)
                 
-                result = calculator.calculate_emissions(distance, weight, mode)
+                result = _calc_emissions(distance, weight, mode)
                 
                 st.success("✅ Calculation Complete!")
                 
@@ -358,7 +454,7 @@ elif page == "🧮 Emission Calculator":
                     )
                 
                 with col_r2:
-                    carbon_tax = calculator.calculate_carbon_tax_cost(result['co2_emissions_kg'])
+                    carbon_tax = _carbon_tax(result['co2_emissions_kg'])
                     st.metric(
                         "Carbon Tax Cost", 
                         f"${carbon_tax['carbon_tax_cost_usd']:.2f}",
@@ -374,28 +470,36 @@ elif page == "🧮 Emission Calculator":
                 
                 # Comparison with other modes
                 st.markdown("### 🔄 Transport Mode Comparison")
-                comparison_df = calculator.compare_transport_modes(distance, weight)
-                
-                fig = px.bar(
-                    comparison_df,
-                    x='transport_mode',
-                    y='co2_emissions_kg',
-                    color='co2_emissions_kg',
-                    color_continuous_scale=['#2ECC71', '#E74C3C'],
-                    title="CO₂ Emissions by Transport Mode"
+                comparison_df = _comparison_df(distance, weight)
+                
+                co2_values = comparison_df['co2_emissions_kg'].to_numpy()
+                fig = go.Figure(go.Bar(
+                    x=comparison_df['transport_mode'].to_numpy(),
+                    y=co2_values,
+                    marker=dict(
+                        color=co2_values,
+                        colorscale=[[0, '#2ECC71'], [1, '#E74C3C']],
+                        showscale=True
+                    )
+                ))
+                fig.update_layout(title="CO₂ Emissions by Transport Mode")
+                st.plotly_chart(fig, use_container_width=True, config=INTERACTIVE_CFG)
+                
+                st.dataframe(
+                    comparison_df.round({
+                        'co2_emissions_kg': 3,
+                        'emission_difference_vs_best': 3,
+                        'emission_percentage_vs_best': 1
+                    }),
+                    use_container_width=True
                 )
-                fig.update_layout(height=400)
-                st.plotly_chart(fig, use_container_width=True)
-                
-                st.dataframe(comparison_df, use_container_width=True)
                 
             except Exception as e:
                 st.error(f"❌ Calculation failed: {str(e)}")
     
     with col2:
         st.markdown("### 📋 Emission Factors")
-        factors_df = calculator.get_emission_factors_table()
-        st.dataframe(factors_df, use_container_width=True)
+        st.markdown(_factors_html(), unsafe_allow_html=True)
         
         st.markdown("### 🌱 Green Tips")
         st.info("""
@@ -406,7 +510,10 @@ elif page == "🧮 Emission Calculator":
         - Consider multimodal transport
         """)
 
-elif page == "🗺️ Route Optimizer":
+@st.fragment  # form submits rerun only this page body
+def _page_route_optimizer():
+    from plotly.subplots import make_subplots
+    
     st.markdown("## 🗺️ Green Route Optimizer")
     st.markdown("Find the most eco-friendly routes for your shipments")
     
@@ -437,24 +544,44 @@ elif page == "🗺️ Route Optimizer":
                     # Display recommendations
                     st.markdown("### 🌱 Green Route Recommendations")
                     
-                    for i, route in enumerate(route_data):
-                        with st.expander(f"Option {i+1}: {route['transport_mode'].replace('_', ' ').title()}", expanded=(i==0)):
+                    # Recommended route keeps the full metric layout
+                    if route_data:
+                        best = route_data[0]
+                        with st.expander(f"Option 1: {best['transport_mode'].replace('_', ' ').title()}", expanded=True):
                             col_a, col_b, col_c, col_d = st.columns(4)
                             
                             with col_a:
-                                st.metric("CO₂ Emissions", f"{route['co2_emissions_kg']:.1f} kg")
+                                st.metric("CO₂ Emissions", f"{best['co2_emissions_kg']:.1f} kg")
                             with col_b:
-                                st.metric("Travel Time", f"{route['estimated_travel_time_hours']:.1f} hrs")
+                                st.metric("Travel Time", f"{best['estimated_travel_time_hours']:.1f} hrs")
                             with col_c:
-                                st.metric("Carbon Tax", f"${route['carbon_tax_cost_usd']:.2f}")
+                                st.metric("Carbon Tax", f"${best['carbon_tax_cost_usd']:.2f}")
                             with col_d:
-                                if route['emission_reduction_percent'] > 0:
-                                    st.metric("Emission Reduction", f"{route['emission_reduction_percent']:.1f}%", "vs worst option")
+                                if best['emission_reduction_percent'] > 0:
+                                    st.metric("Emission Reduction", f"{best['emission_reduction_percent']:.1f}%", "vs worst option")
                                 else:
                                     st.metric("Emission Impact", "Baseline", "")
                             
-                            if i == 0:
-                                st.markdown('<span class="eco-badge">🌱 RECOMMENDED</span>', unsafe_allow_html=True)
+                            st.markdown('<span class="eco-badge">🌱 RECOMMENDED</span>', unsafe_allow_html=True)
+                    
+                    # Remaining options as one HTML card grid ($ escaped so markdown doesn't pair it as math)
+                    if len(route_data) > 1:
+                        cards = []
+                        for i, route in enumerate(route_data[1:], start=2):
+                            if route['emission_reduction_percent'] > 0:
+                                impact = f"Emission Reduction: <strong>{route['emission_reduction_percent']:.1f}%</strong> vs worst option"
+                            else:
+                                impact = "Emission Impact: <strong>Baseline</strong>"
+                            cards.append(
+                                '<div class="metric-card route-card">'
+                                f"<h4>Option {i}: {route['transport_mode'].replace('_', ' ').title()}</h4>"
+                                f"<p>CO₂ Emissions: <strong>{route['co2_emissions_kg']:.1f} kg</strong></p>"
+                                f"<p>Travel Time: <strong>{route['estimated_travel_time_hours']:.1f} hrs</strong></p>"
+                                f"<p>Carbon Tax: <strong>&#36;{route['carbon_tax_cost_usd']:.2f}</strong></p>"
+                                f"<p>{impact}</p>"
+                                "</div>"
+                            )
+                        st.markdown(f'<div class="route-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
                     
                     # Visualization
                     if len(route_data) > 1:
@@ -470,8 +597,8 @@ elif page == "🗺️ Route Optimizer":
                         
                         fig.add_trace(
                             go.Bar(
-                                x=df_viz['transport_mode'],
-                                y=df_viz['co2_emissions_kg'],
+                                x=df_viz['transport_mode'].to_numpy(),
+                                y=df_viz['co2_emissions_kg'].to_numpy(),
                                 name='CO₂ Emissions',
                                 marker_color='#2ECC71'
                             ),
@@ -480,16 +607,16 @@ elif page == "🗺️ Route Optimizer":
                         
                         fig.add_trace(
                             go.Bar(
-                                x=df_viz['transport_mode'],
-                                y=df_viz['estimated_travel_time_hours'],
+                                x=df_viz['transport_mode'].to_numpy(),
+                                y=df_viz['estimated_travel_time_hours'].to_numpy(),
                                 name='Travel Time',
                                 marker_color='#3498DB'
                             ),
                             row=1, col=2
                         )
                         
-                        fig.update_layout(height=400, showlegend=False)
-                        st.plotly_chart(fig, use_container_width=True)
+                        fig.update_layout(showlegend=False)
+                        st.plotly_chart(fig, use_container_width=True, config=INTERACTIVE_CFG)
                 
                 else:
                     st.error(f"❌ Route optimization failed: {recommendations.get('error', 'Unknown error')}")
@@ -497,7 +624,10 @@ elif page == "🗺️ Route Optimizer":
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
 
-elif page == "📊 Scenario Analysis":
+@st.fragment  # form submits rerun only this page body
+def _page_scenario():
+    from plotly.subplots import make_subplots
+    
     st.markdown("## 📊 Business Impact Simulation")
     st.markdown("Analyze the potential impact of adopting green shipping practices")
     
@@ -513,7 +643,7 @@ elif page == "📊 Scenario Analysis":
         with col2:
             st.markdown("### ⚙️ Optimization Parameters")
             optimization_percent = st.slider("% Shipments Using Green Routes", 0, 100, 50)
-            current_mode = st.selectbox("Current Transport Mode", [mode.value for mode in TransportMode], index=0)
+            current_mode = st.selectbox("Current Transport Mode", _MODE_VALUES, index=0)
             carbon_tax_rate = st.number_input("Carbon Tax Rate ($/tonne CO₂)", min_value=0.0, value=50.0, step=5.0)
         
         analyze_btn = st.form_submit_button("📊 Run Scenario Analysis", type="primary")
@@ -521,39 +651,22 @@ elif page == "📊 Scenario Analysis":
     if analyze_btn:
         with st.spinner("🔄 Running business impact simulation..."):
             try:
-                # Current emissions - use same mapping as before
-                mode_mapping = {
-                    'road_truck': TransportMode.ROAD_TRUCK,
-                    'road_van': TransportMode.ROAD_VAN,
-                    'rail': TransportMode.RAIL,
-                    'air_cargo': TransportMode.AIR_CARGO,
-                    'ship_container': TransportMode.SHIP_CONTAINER,
-                    'ship_bulk': TransportMode.SHIP_BULK
-                }
-                
-                if current_mode in mode_mapping:
-                    current_mode_enum = mode_mapping[current_mode]
-                else:
-                    current_mode_enum = TransportMode(current_mode)
-                
-                current_emissions = calculator.calculate_emissions(avg_distance, avg_weight, current_mode_enum)
-                
-                # Find best green alternative - calculate manually to avoid EmissionOptimizer import
-                available_modes = [TransportMode.ROAD_TRUCK, TransportMode.RAIL, TransportMode.SHIP_CONTAINER]
-                
-                # Calculate emissions for each mode and find the greenest
-                mode_options = []
-                for mode in available_modes:
-                    emissions = calculator.calculate_emissions(avg_distance, avg_weight, mode)
-                    mode_options.append({
-                        'mode': mode,
-                        'co2_emissions_kg': emissions['co2_emissions_kg'],
-                        'emission_factor': emissions['emission_factor']
-                    })
-                
-                # Sort by emissions (lowest first) to find greenest option
-                mode_options.sort(key=lambda x: x['co2_emissions_kg'])
-                green_option = mode_options[0] if mode_options else None
+                # Current emissions
+                current_mode_enum = _MODE_BY_VALUE.get(current_mode) or TransportMode(current_mode)
+                
+                current_emissions = _calc_emissions(avg_distance, avg_weight, current_mode_enum)
+                
+                # Find best green alternative - one vector multiply over the candidate factors
+                available_modes, factors = _green_candidates()
+                green_option = None
+                if len(available_modes) > 0:
+                    emissions_kg = factors * avg_distance * avg_weight
+                    idx = int(emissions_kg.argmin())
+                    green_option = {
+                        'mode': available_modes[idx],
+                        'co2_emissions_kg': float(emissions_kg[idx]),
+                        'emission_factor': float(factors[idx])
+                    }
                 
                 if not green_option:
                     st.error("❌ No green alternatives available")
@@ -573,31 +686,31 @@ elif page == "📊 Scenario Analysis":
                 savings_percent = (savings_kg / current_total) * 100
                 carbon_tax_savings = (savings_kg / 1000) * carbon_tax_rate
                 
+                # Display-unit conversions, computed once for the metrics, chart and text
+                current_t = current_total / 1000.0
+                optimized_t = optimized_total / 1000.0
+                annual_savings = carbon_tax_savings * 12.0
+                
                 st.success("✅ Scenario analysis complete!")
                 
                 # Results
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
-                    st.metric("Current Emissions", f"{current_total/1000:.1f} tonnes/month")
+                    st.metric("Current Emissions", f"{current_t:.1f} tonnes/month")
                 with col2:
-                    st.metric("Optimized Emissions", f"{optimized_total/1000:.1f} tonnes/month")
+                    st.metric("Optimized Emissions", f"{optimized_t:.1f} tonnes/month")
                 with col3:
                     st.metric("CO₂ Savings", f"{savings_kg/1000:.1f} tonnes/month", f"{savings_percent:.1f}% reduction")
                 with col4:
-                    st.metric("Carbon Tax Savings", f"${carbon_tax_savings:.0f}/month", f"${carbon_tax_savings*12:.0f}/year")
+                    st.metric("Carbon Tax Savings", f"${carbon_tax_savings:.0f}/month", f"${annual_savings:.0f}/year")
                 
                 # Visualization
                 st.markdown("### 📈 Impact Visualization")
                 
-                scenario_data = pd.DataFrame({
-                    'Scenario': ['Current', 'Optimized'],
-                    'CO₂ Emissions (tonnes)': [current_total/1000, optimized_total/1000],
-                    'Carbon Tax Cost ($)': [
-                        (current_total/1000) * carbon_tax_rate,
-                        (optimized_total/1000) * carbon_tax_rate
-                    ]
-                })
+                scenarios = ['Current', 'Optimized']
+                scenario_tonnes = [current_t, optimized_t]
+                scenario_tax = [current_t * carbon_tax_rate, optimized_t * carbon_tax_rate]
                 
                 fig = make_subplots(
                     rows=1, cols=2,
@@ -607,8 +720,8 @@ elif page == "📊 Scenario Analysis":
                 
                 fig.add_trace(
                     go.Bar(
-                        x=scenario_data['Scenario'],
-                        y=scenario_data['CO₂ Emissions (tonnes)'],
+                        x=scenarios,
+                        y=scenario_tonnes,
                         name='CO₂ Emissions',
                         marker_color=['#E74C3C', '#2ECC71']
                     ),
@@ -617,16 +730,16 @@ elif page == "📊 Scenario Analysis":
                 
                 fig.add_trace(
                     go.Bar(
-                        x=scenario_data['Scenario'],
-                        y=scenario_data['Carbon Tax Cost ($)'],
+                        x=scenarios,
+                        y=scenario_tax,
                         name='Carbon Tax Cost',
                         marker_color=['#E74C3C', '#2ECC71']
                     ),
                     row=1, col=2
                 )
                 
-                fig.update_layout(height=400, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                fig.update_layout(showlegend=False)
+                st.plotly_chart(fig, use_container_width=True, theme=None, config=STATIC_CFG)
                 
                 # Business benefits
                 st.markdown("### 💼 Business Benefits")
@@ -645,7 +758,7 @@ elif page == "📊 Scenario Analysis":
                 with benefits_col2:
                     st.markdown(f"""
                     **Financial Benefits:**
-                    - 💰 ${carbon_tax_savings*12:.0f} annual tax savings
+                    - 💰 ${annual_savings:.0f} annual tax savings
                     - 📈 Potential green financing access
                     - 🎯 Regulatory compliance readiness
                     - 💡 Operational efficiency gains
@@ -657,7 +770,7 @@ elif page == "📊 Scenario Analysis":
                 import traceback
                 st.code(traceback.format_exc())
 
-elif page == "📈 Analytics":
+def _page_analytics():
     st.markdown("## 📈 Advanced Analytics")
     
     # Sample analytics data
@@ -695,26 +808,46 @@ elif page == "📈 Analytics":
     # Regional analysis
     st.markdown("### 🌍 Regional Emission Analysis")
     
-    regional_data = pd.DataFrame({
-        'Region': ['North America', 'Europe', 'Asia Pacific', 'Latin America'],
-        'Emissions (tonnes)': [45.2, 32.1, 28.7, 15.3],
-        'Shipments': [450, 320, 380, 180],
-        'Avg Distance (km)': [1200, 800, 950, 600]
-    })
-    
-    fig = px.scatter(
-        regional_data,
-        x='Shipments',
-        y='Emissions (tonnes)',
-        size='Avg Distance (km)',
-        color='Region',
-        title="Regional Emission vs Shipment Volume"
+    regional_data = _regional_df()
+    
+    # WebGL markers, one trace per region (as px.scatter would) so the legend is kept
+    avg_distance = regional_data['Avg Distance (km)'].to_numpy()
+    marker_sizeref = 2.0 * avg_distance.max() / (20 ** 2)
+    fig = go.Figure([
+        go.Scattergl(
+            x=[shipments],
+            y=[emissions],
+            mode='markers',
+            name=region,
+            marker=dict(size=[distance], sizemode='area', sizeref=marker_sizeref)
+        )
+        for region, shipments, emissions, distance in zip(
+            regional_data['Region'].to_numpy(),
+            regional_data['Shipments'].to_numpy(),
+            regional_data['Emissions (tonnes)'].to_numpy(),
+            avg_distance
+        )
+    ])
+    fig.update_layout(
+        title="Regional Emission vs Shipment Volume",
+        xaxis_title='Shipments',
+        yaxis_title='Emissions (tonnes)',
+        height=500
     )
-    fig.update_layout(height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, theme=None, config=STATIC_CFG)
     
-    st.dataframe(regional_data, use_container_width=True)
+    st.markdown(_regional_html(), unsafe_allow_html=True)
 
+PAGES = {
+    "🏠 Dashboard": _page_dashboard,
+    "🧮 Emission Calculator": _page_calculator,
+    "🗺️ Route Optimizer": _page_route_optimizer,
+    "📊 Scenario Analysis": _page_scenario,
+    "📈 Analytics": _page_analytics
+}
+
+# Main content based on selected page
+PAGES[page]()
 
 # Footer
 st.markdown("---")